@@ -0,0 +1,50 @@
+from django.db import models
+
+class VideoUpload(models.Model):
+    PROCESSING_STATUS = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    video_file = models.FileField(upload_to='uploads/videos/')
+    metadata_file = models.FileField(upload_to='uploads/metadata/')
+    recording_start_time = models.DateTimeField(null=True, blank=True)
+    recording_duration_ms = models.IntegerField(default=0)
+    upload_timestamp = models.DateTimeField(auto_now_add=True)
+    processing_status = models.CharField(max_length=50, choices=PROCESSING_STATUS, default='pending')
+    total_detections = models.IntegerField(default=0)
+    total_location_points = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Video Upload {self.id} - {self.upload_timestamp}"
+
+class GarbageDetection(models.Model):
+    """
+    A detection mapped to a location
+
+    The heatmap cube follows save() and delete() through signals. Bulk
+    writes skip those: after bulk_create() call
+    apps.heatmap.cube.record_detections(), and use
+    apps.heatmap.cube.update_detections() instead of QuerySet.update().
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('cleaned', 'Cleaned'),
+    )
+
+    video_upload = models.ForeignKey(VideoUpload, on_delete=models.CASCADE, related_name='detections')
+    detected_at = models.DateTimeField(db_index=True)
+    timestamp_ms = models.IntegerField()
+    frame_number = models.IntegerField()
+    garbage_type = models.CharField(max_length=100)
+    confidence = models.FloatField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    location_accuracy = models.FloatField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+
+    def __str__(self):
+        return f"{self.garbage_type} at {self.latitude}, {self.longitude}"
@@ -0,0 +1,105 @@
+import json
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User
+from apps.maps.models import GpsTrack
+from .models import VideoUpload
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class UploadVideoApiTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('worker', password='pw'))
+
+    def _upload(self, metadata):
+        return self.client.post('/api/upload-video/', {
+            'video': SimpleUploadedFile('v.mp4', b'video'),
+            'metadata': SimpleUploadedFile('m.json', json.dumps(metadata).encode('utf-8')),
+        })
+
+    def test_stores_upload_and_track(self):
+        response = self._upload({
+            'recording_start_time': 1705320625000,
+            'recording_duration_ms': 1000,
+            'location_data': [
+                {'timestamp': 1705320625000, 'latitude': 37.77, 'longitude': -122.42},
+                {'timestamp': 1705320626000, 'latitude': 37.78, 'longitude': -122.41},
+            ],
+        })
+        self.assertEqual(response.status_code, 200)
+        upload = VideoUpload.objects.get(pk=response.json()['upload_id'])
+        self.assertEqual(upload.total_location_points, 2)
+        self.assertEqual(upload.gps_track.point_count, 2)
+
+    def test_null_timestamps(self):
+        response = self._upload({
+            'recording_start_time': 1705320625000,
+            'location_data': [
+                {'timestamp': None, 'relative_time_ms': 1000, 'latitude': 37.78, 'longitude': -122.41},
+                {'timestamp': 1705320625000, 'latitude': 37.77, 'longitude': -122.42},
+            ],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(GpsTrack.objects.count(), 1)
+
+    def test_rejects_metadata_that_is_not_an_object(self):
+        self.assertEqual(self._upload([]).status_code, 400)
+        self.assertEqual(self._upload({'location_data': 'nope'}).status_code, 400)
+        self.assertEqual(VideoUpload.objects.count(), 0)
+
+    def test_skips_frames_with_invalid_coordinates(self):
+        response = self._upload({
+            'recording_start_time': 1705320625000,
+            'location_data': [
+                {'timestamp': 1705320625000, 'latitude': '37.7', 'longitude': -122.42},
+                {'timestamp': 1705320625000, 'latitude': '3' * 5000, 'longitude': -122.42},
+                {'timestamp': 1705320626000, 'latitude': float('nan'), 'longitude': -122.42},
+                {'timestamp': 1705320627000, 'latitude': True, 'longitude': -122.42},
+                {'timestamp': 1705320628000, 'latitude': 91.0, 'longitude': -122.42},
+                {'timestamp': 1705320629000, 'latitude': 37.77, 'longitude': 1e308},
+                {'timestamp': 1705320630000, 'latitude': 37.77, 'longitude': -122.42},
+            ],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(GpsTrack.objects.get().point_count, 1)
+
+    def test_treats_invalid_frame_times_as_missing(self):
+        response = self._upload({
+            'recording_start_time': 1705320625000,
+            'recording_duration_ms': 2000,
+            'location_data': [
+                {'timestamp': '1705320625000', 'relative_time_ms': 0, 'latitude': 37.77, 'longitude': -122.42},
+                {'timestamp': 1705320626000, 'relative_time_ms': 'x', 'latitude': 37.78, 'longitude': -122.41},
+                {'timestamp': float('nan'), 'relative_time_ms': 10 ** 30, 'latitude': 37.79, 'longitude': -122.40},
+            ],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(GpsTrack.objects.get().point_count, 3)
+
+    def test_all_frames_invalid_stores_upload_without_track(self):
+        response = self._upload({'location_data': [{'latitude': '37.7', 'longitude': '-122.4'}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(VideoUpload.objects.count(), 1)
+        self.assertFalse(GpsTrack.objects.exists())
+
+    def test_rejects_invalid_recording_fields(self):
+        for metadata in (
+            {'recording_start_time': '1705320625000', 'location_data': []},
+            {'recording_start_time': float('nan'), 'location_data': []},
+            {'recording_start_time': 10 ** 30, 'location_data': []},
+            {'recording_duration_ms': 'abc', 'location_data': []},
+            {'recording_duration_ms': -1, 'location_data': []},
+        ):
+            self.assertEqual(self._upload(metadata).status_code, 400, metadata)
+        self.assertEqual(VideoUpload.objects.count(), 0)
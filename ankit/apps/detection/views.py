@@ -2,10 +2,16 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.db import transaction
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from datetime import datetime, timezone
 import json
 
+from apps.maps.models import GpsTrack
+from apps.maps.tracks import MAX_DURATION_MS, MAX_EPOCH_MS, as_number
+from .models import VideoUpload
+
 @login_required
 def detection_list(request):
     return render(request, 'detection/detection_list.html')
@@ -28,11 +34,54 @@ def upload_video_api(request):
                 'status': 'error'
             }, status=400)
         
-        # Basic file handling (extend with YOLO processing)
+        try:
+            metadata_json = json.loads(metadata_file.read().decode('utf-8'))
+            metadata_file.seek(0)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return Response({
+                'error': f'Invalid JSON metadata: {str(e)}',
+                'status': 'error'
+            }, status=400)
+        
+        if not isinstance(metadata_json, dict) or not isinstance(metadata_json.get('location_data', []), list):
+            return Response({
+                'error': 'Metadata must be a JSON object with a location_data list',
+                'status': 'error'
+            }, status=400)
+        
+        location_data = metadata_json.get('location_data', [])
+        start_ms = metadata_json.get('recording_start_time')
+        duration_ms = metadata_json.get('recording_duration_ms')
+        
+        if start_ms is not None and as_number(start_ms, 0, MAX_EPOCH_MS) is None:
+            return Response({
+                'error': 'recording_start_time must be epoch milliseconds',
+                'status': 'error'
+            }, status=400)
+        
+        if duration_ms is not None and as_number(duration_ms, 0, MAX_DURATION_MS) is None:
+            return Response({
+                'error': 'recording_duration_ms must be a non-negative number of milliseconds',
+                'status': 'error'
+            }, status=400)
+        
+        # Don't leave an upload behind if its track can't be stored
+        with transaction.atomic():
+            upload = VideoUpload.objects.create(
+                video_file=video_file,
+                metadata_file=metadata_file,
+                recording_start_time=datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc) if start_ms else None,
+                recording_duration_ms=int(duration_ms or 0),
+                total_location_points=len(location_data),
+            )
+            
+            # Compact track for coverage overlays (extend with YOLO processing)
+            GpsTrack.from_location_data(upload, location_data)
+        
         return Response({
             'status': 'success',
             'message': 'Files received successfully',
-            'upload_id': 1  # Placeholder
+            'upload_id': upload.id
         })
         
     except Exception as e:
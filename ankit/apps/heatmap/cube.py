@@ -0,0 +1,245 @@
+"""Grid cell x time bucket x garbage type count cube.
+
+Detections are counted into day, week and month buckets as they are saved,
+so heatmap and trend queries only ever read a few pre-aggregated rows
+instead of scanning GarbageDetection.
+"""
+import copy
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.detection.models import GarbageDetection
+from .models import HeatmapCell
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def cell_size():
+    return getattr(settings, 'HEATMAP_CELL_SIZE_DEG', 0.001)
+
+
+def cell_for(latitude, longitude):
+    """Grid cell (x, y) containing a point"""
+    size = cell_size()
+    return math.floor(longitude / size), math.floor(latitude / size)
+
+
+def cell_center(cell_x, cell_y):
+    """(latitude, longitude) of the center of a grid cell"""
+    size = cell_size()
+    return (cell_y + 0.5) * size, (cell_x + 0.5) * size
+
+
+def bucket_start(day, granularity):
+    """First day of the bucket containing `day` (weeks start on Monday)"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def rollup(day_counts):
+    """
+    Roll day counts up into every granularity
+
+    Args:
+        day_counts: Mapping of (day, cell_x, cell_y, garbage_type) -> count
+
+    Returns:
+        Counter keyed by (granularity, bucket, cell_x, cell_y, garbage_type)
+    """
+    counts = Counter()
+    for (day, cell_x, cell_y, garbage_type), count in day_counts.items():
+        for granularity in GRANULARITIES:
+            counts[(granularity, bucket_start(day, granularity), cell_x, cell_y, garbage_type)] += count
+    return counts
+
+
+def detection_key(detection):
+    """
+    (day, cell_x, cell_y, garbage_type) of a detection
+
+    Field values are run through the model fields first, so a detection
+    created with e.g. an ISO string for detected_at is bucketed correctly.
+    """
+    fields = GarbageDetection._meta
+    detected_at = fields.get_field('detected_at').to_python(detection.detected_at)
+    if timezone.is_naive(detected_at):
+        detected_at = timezone.make_aware(detected_at)
+    latitude = fields.get_field('latitude').to_python(detection.latitude)
+    longitude = fields.get_field('longitude').to_python(detection.longitude)
+    cell_x, cell_y = cell_for(latitude, longitude)
+    return timezone.localdate(detected_at), cell_x, cell_y, detection.garbage_type
+
+
+def record_detections(detections, sign=1):
+    """
+    Incrementally add (or with sign=-1, remove) detections to the cube
+
+    Args:
+        detections: Iterable of GarbageDetection instances
+        sign: 1 to add, -1 to remove
+    """
+    day_counts = Counter()
+    day_cleaned = Counter()
+    for detection in detections:
+        key = detection_key(detection)
+        day_counts[key] += sign
+        if detection.status == 'cleaned':
+            day_cleaned[key] += sign
+
+    cleaned = rollup(day_cleaned)
+
+    with transaction.atomic():
+        for cube_key, count in rollup(day_counts).items():
+            granularity, bucket, cell_x, cell_y, garbage_type = cube_key
+            key = {
+                'granularity': granularity,
+                'bucket': bucket,
+                'cell_x': cell_x,
+                'cell_y': cell_y,
+                'garbage_type': garbage_type,
+            }
+            cleaned_count = cleaned[cube_key]
+            cells = HeatmapCell.objects.filter(**key)
+            if cells.update(count=F('count') + count, cleaned_count=F('cleaned_count') + cleaned_count):
+                if count < 0:
+                    cells.filter(count__lte=0).delete()
+                continue
+            if count <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    HeatmapCell.objects.create(count=count, cleaned_count=cleaned_count, **key)
+            except IntegrityError:
+                # Created concurrently by another request
+                cells.update(count=F('count') + count, cleaned_count=F('cleaned_count') + cleaned_count)
+
+
+def update_detections(queryset, **fields):
+    """
+    Bulk update detections and keep the cube in sync
+
+    QuerySet.update() skips the save signals, so use this instead, e.g. to
+    mark a block cleaned. Values must be plain values, not F() expressions.
+
+    Returns:
+        Number of detections updated
+    """
+    with transaction.atomic():
+        previous = list(queryset.select_for_update())
+        if not previous:
+            return 0
+        updated = []
+        for detection in previous:
+            detection = copy.copy(detection)
+            for field, value in fields.items():
+                setattr(detection, field, value)
+            updated.append(detection)
+
+        GarbageDetection.objects.filter(pk__in=[detection.pk for detection in previous]).update(**fields)
+        record_detections(previous, sign=-1)
+        record_detections(updated)
+    return len(previous)
+
+
+def cells_in_range(granularity, start, end, bbox=None, garbage_type=None):
+    """
+    Cube rows for buckets overlapping [start, end]
+
+    Args:
+        granularity: 'day', 'week' or 'month'
+        start, end: Dates, inclusive
+        bbox: Optional (min_lng, min_lat, max_lng, max_lat)
+        garbage_type: Optional type filter
+    """
+    cells = HeatmapCell.objects.filter(
+        granularity=granularity,
+        bucket__gte=bucket_start(start, granularity),
+        bucket__lte=end,
+    )
+    if bbox:
+        min_lng, min_lat, max_lng, max_lat = bbox
+        min_x, min_y = cell_for(min_lat, min_lng)
+        max_x, max_y = cell_for(max_lat, max_lng)
+        cells = cells.filter(cell_x__gte=min_x, cell_x__lte=max_x, cell_y__gte=min_y, cell_y__lte=max_y)
+    if garbage_type:
+        cells = cells.filter(garbage_type=garbage_type)
+    return cells
+
+
+def _cell_dict(cell_x, cell_y, **extra):
+    latitude, longitude = cell_center(cell_x, cell_y)
+    return {'cell_x': cell_x, 'cell_y': cell_y, 'latitude': latitude, 'longitude': longitude, **extra}
+
+
+def heatmap(granularity, start, end, bbox=None, garbage_type=None, limit=None):
+    """Total count per cell, busiest first; with `limit` this is the hotspot list"""
+    totals = (
+        cells_in_range(granularity, start, end, bbox, garbage_type)
+        .values('cell_x', 'cell_y')
+        .annotate(total=Sum('count'))
+        .order_by('-total')
+    )
+    if limit:
+        totals = totals[:limit]
+    return [_cell_dict(row['cell_x'], row['cell_y'], count=row['total']) for row in totals]
+
+
+def trend(granularity, start, end, bbox=None, garbage_type=None):
+    """Count per bucket and garbage type, oldest first"""
+    rows = (
+        cells_in_range(granularity, start, end, bbox, garbage_type)
+        .values('bucket', 'garbage_type')
+        .annotate(total=Sum('count'))
+        .order_by('bucket', 'garbage_type')
+    )
+    return [
+        {'bucket': row['bucket'], 'garbage_type': row['garbage_type'], 'count': row['total']}
+        for row in rows
+    ]
+
+
+def recurrence(granularity, start, end, bbox=None, garbage_type=None, limit=None):
+    """
+    How often each cell gets dirty again after being cleaned
+
+    A cleaning is a bucket in which the cell has detections marked cleaned.
+    It recurred if the cell has any detection in a later bucket of the range.
+    Cleanings in the last bucket of the range can't be followed up yet and
+    are left out. recurrence_rate is recurrences / cleanings.
+    """
+    active = defaultdict(set)
+    cleaned = defaultdict(set)
+    rows = cells_in_range(granularity, start, end, bbox, garbage_type).values_list(
+        'cell_x', 'cell_y', 'bucket', 'cleaned_count'
+    )
+    for cell_x, cell_y, bucket, cleaned_count in rows:
+        active[(cell_x, cell_y)].add(bucket)
+        if cleaned_count:
+            cleaned[(cell_x, cell_y)].add(bucket)
+
+    last_bucket = bucket_start(end, granularity)
+    results = []
+    for cell, cleaned_buckets in cleaned.items():
+        cleanings = [bucket for bucket in cleaned_buckets if bucket < last_bucket]
+        if not cleanings:
+            continue
+        last_active = max(active[cell])
+        recurrences = sum(1 for bucket in cleanings if bucket < last_active)
+        results.append(_cell_dict(
+            *cell,
+            cleanings=len(cleanings),
+            recurrences=recurrences,
+            recurrence_rate=round(recurrences / len(cleanings), 4),
+        ))
+
+    results.sort(key=lambda cell: (cell['recurrence_rate'], cell['recurrences']), reverse=True)
+    return results[:limit] if limit else results
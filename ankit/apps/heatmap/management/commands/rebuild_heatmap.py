@@ -0,0 +1,51 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.detection.models import GarbageDetection
+from apps.heatmap.cube import cell_for, rollup
+from apps.heatmap.models import HeatmapCell
+
+class Command(BaseCommand):
+    help = 'Rebuild the heatmap cube from all garbage detections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        day_counts = Counter()
+        day_cleaned = Counter()
+        detections = GarbageDetection.objects.values_list(
+            'detected_at', 'latitude', 'longitude', 'garbage_type', 'status'
+        ).iterator(chunk_size=options['batch_size'])
+
+        for detected_at, latitude, longitude, garbage_type, status in detections:
+            cell_x, cell_y = cell_for(latitude, longitude)
+            key = (timezone.localdate(detected_at), cell_x, cell_y, garbage_type)
+            day_counts[key] += 1
+            if status == 'cleaned':
+                day_cleaned[key] += 1
+
+        cleaned = rollup(day_cleaned)
+        cells = [
+            HeatmapCell(
+                granularity=granularity,
+                bucket=bucket,
+                cell_x=cell_x,
+                cell_y=cell_y,
+                garbage_type=garbage_type,
+                count=count,
+                cleaned_count=cleaned[(granularity, bucket, cell_x, cell_y, garbage_type)],
+            )
+            for (granularity, bucket, cell_x, cell_y, garbage_type), count in rollup(day_counts).items()
+        ]
+
+        with transaction.atomic():
+            HeatmapCell.objects.all().delete()
+            HeatmapCell.objects.bulk_create(cells, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt heatmap: {sum(day_counts.values())} detections, {len(cells)} cells'
+        ))
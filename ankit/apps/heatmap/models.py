@@ -0,0 +1,30 @@
+from django.db import models
+
+class HeatmapCell(models.Model):
+    """Detection count for one grid cell x time bucket x garbage type"""
+
+    GRANULARITY_CHOICES = (
+        ('day', 'Day'),
+        ('week', 'Week'),
+        ('month', 'Month'),
+    )
+
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket = models.DateField()  # First day of the day/week/month
+    cell_x = models.IntegerField()  # floor(longitude / HEATMAP_CELL_SIZE_DEG)
+    cell_y = models.IntegerField()  # floor(latitude / HEATMAP_CELL_SIZE_DEG)
+    garbage_type = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    cleaned_count = models.IntegerField(default=0)  # Of `count`, detections marked cleaned
+
+    class Meta:
+        constraints = [
+            # Also serves range queries, which filter on its leading columns
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'cell_x', 'cell_y', 'garbage_type'],
+                name='unique_heatmap_cell',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket} ({self.cell_x}, {self.cell_y}) {self.garbage_type}: {self.count} ({self.cleaned_count} cleaned)"
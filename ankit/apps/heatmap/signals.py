@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.detection.models import GarbageDetection
+from .cube import detection_key, record_detections
+
+@receiver(pre_save, sender=GarbageDetection)
+def remember_previous_detection(sender, instance, **kwargs):
+    instance._heatmap_previous = None
+    if instance.pk:
+        instance._heatmap_previous = sender.objects.filter(pk=instance.pk).first()
+
+@receiver(post_save, sender=GarbageDetection)
+def add_detection_to_cube(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_heatmap_previous', None)
+    if previous is None:
+        record_detections([instance])
+        return
+
+    if detection_key(previous) != detection_key(instance) or previous.status != instance.status:
+        with transaction.atomic():
+            record_detections([previous], sign=-1)
+            record_detections([instance])
+
+@receiver(post_delete, sender=GarbageDetection)
+def remove_detection_from_cube(sender, instance, **kwargs):
+    record_detections([instance], sign=-1)
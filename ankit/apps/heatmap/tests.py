@@ -0,0 +1,201 @@
+from datetime import date, datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from apps.accounts.models import User
+from apps.detection.models import GarbageDetection, VideoUpload
+from . import cube
+from .models import HeatmapCell
+
+
+def _cube_rows():
+    return sorted(HeatmapCell.objects.values_list(
+        'granularity', 'bucket', 'cell_x', 'cell_y', 'garbage_type', 'count', 'cleaned_count'
+    ))
+
+
+class RollupTests(SimpleTestCase):
+    def test_week_starts_monday(self):
+        # 2024-01-07 is a Sunday, 2024-01-08 a Monday
+        counts = cube.rollup({(date(2024, 1, 7), 0, 0, 'plastic'): 1, (date(2024, 1, 8), 0, 0, 'plastic'): 2})
+        self.assertEqual(counts[('week', date(2024, 1, 1), 0, 0, 'plastic')], 1)
+        self.assertEqual(counts[('week', date(2024, 1, 8), 0, 0, 'plastic')], 2)
+        self.assertEqual(counts[('day', date(2024, 1, 7), 0, 0, 'plastic')], 1)
+
+    def test_month_rollover(self):
+        counts = cube.rollup({(date(2024, 1, 31), 0, 0, 'food'): 1, (date(2024, 2, 1), 0, 0, 'food'): 3})
+        self.assertEqual(counts[('month', date(2024, 1, 1), 0, 0, 'food')], 1)
+        self.assertEqual(counts[('month', date(2024, 2, 1), 0, 0, 'food')], 3)
+        # Both days fall in the week starting Monday 2024-01-29
+        self.assertEqual(counts[('week', date(2024, 1, 29), 0, 0, 'food')], 4)
+
+    def test_year_rollover(self):
+        self.assertEqual(cube.bucket_start(date(2024, 12, 31), 'week'), date(2024, 12, 30))
+        self.assertEqual(cube.bucket_start(date(2025, 1, 1), 'week'), date(2024, 12, 30))
+        self.assertEqual(cube.bucket_start(date(2025, 1, 1), 'month'), date(2025, 1, 1))
+
+
+class CubeTests(TestCase):
+    def setUp(self):
+        self.upload = VideoUpload.objects.create(video_file='v.mp4', metadata_file='m.json')
+
+    def _detect(self, detected_at, latitude=37.7705, longitude=-122.4105, garbage_type='plastic', status='pending'):
+        return GarbageDetection.objects.create(
+            video_upload=self.upload, detected_at=detected_at, timestamp_ms=0, frame_number=0,
+            garbage_type=garbage_type, confidence=0.9, latitude=latitude, longitude=longitude,
+            location_accuracy=3, status=status,
+        )
+
+    def test_add_then_delete_empties_cube(self):
+        first = self._detect(datetime(2024, 1, 1, 10, tzinfo=timezone.utc))
+        second = self._detect(datetime(2024, 1, 1, 11, tzinfo=timezone.utc), status='cleaned')
+        self.assertEqual(
+            set(HeatmapCell.objects.values_list('granularity', 'count', 'cleaned_count')),
+            {('day', 2, 1), ('week', 2, 1), ('month', 2, 1)},
+        )
+
+        second.delete()
+        self.assertEqual(HeatmapCell.objects.filter(count=1, cleaned_count=0).count(), 3)
+        first.delete()
+        self.assertFalse(HeatmapCell.objects.exists())
+
+    def test_update_moves_detection(self):
+        detection = self._detect(datetime(2024, 1, 1, tzinfo=timezone.utc))
+        detection.garbage_type = 'glass'
+        detection.detected_at = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        detection.save()
+
+        self.assertFalse(HeatmapCell.objects.filter(garbage_type='plastic').exists())
+        self.assertEqual(HeatmapCell.objects.get(granularity='day').bucket, date(2024, 6, 1))
+
+    def test_update_status_counts_cleaned(self):
+        detection = self._detect(datetime(2024, 1, 1, tzinfo=timezone.utc))
+        detection.status = 'cleaned'
+        detection.save()
+        self.assertEqual(set(HeatmapCell.objects.values_list('count', 'cleaned_count')), {(1, 1)})
+
+    def test_accepts_unconverted_field_values(self):
+        self._detect('2024-02-01T10:00:00Z', latitude='37.7705', longitude='-122.4105')
+        self.assertEqual(HeatmapCell.objects.get(granularity='day').bucket, date(2024, 2, 1))
+
+    def test_rebuild_matches_incremental(self):
+        for i in range(40):
+            self._detect(
+                datetime(2024, 1 + i % 3, 1 + i % 28, i % 24, tzinfo=timezone.utc),
+                latitude=37.77 + (i % 5) * 0.001,
+                longitude=-122.41 - (i % 4) * 0.001,
+                garbage_type=('plastic', 'food')[i % 2],
+                status=('pending', 'cleaned')[i % 3 == 0],
+            )
+        for detection in GarbageDetection.objects.all()[:5]:
+            detection.delete()
+
+        incremental = _cube_rows()
+        call_command('rebuild_heatmap', stdout=StringIO())
+        self.assertEqual(_cube_rows(), incremental)
+        self.assertEqual(
+            sum(row[5] for row in incremental if row[0] == 'day'), GarbageDetection.objects.count()
+        )
+
+
+    def test_bulk_writes_through_helpers_match_rebuild(self):
+        detections = GarbageDetection.objects.bulk_create([
+            GarbageDetection(
+                video_upload=self.upload, detected_at=datetime(2024, 1, 1 + i, tzinfo=timezone.utc), timestamp_ms=0,
+                frame_number=0, garbage_type='plastic', confidence=0.9, latitude=37.7705 + i * 0.001,
+                longitude=-122.4105, location_accuracy=3,
+            )
+            for i in range(6)
+        ])
+        cube.record_detections(detections)
+        updated = cube.update_detections(
+            GarbageDetection.objects.filter(detected_at__lt=datetime(2024, 1, 4, tzinfo=timezone.utc)),
+            status='cleaned',
+        )
+        self.assertEqual(updated, 3)
+
+        incremental = _cube_rows()
+        call_command('rebuild_heatmap', stdout=StringIO())
+        self.assertEqual(_cube_rows(), incremental)
+        month_cells = HeatmapCell.objects.filter(granularity='month')
+        self.assertEqual(sorted(month_cells.values_list('cleaned_count', flat=True)), [0, 0, 0, 1, 1, 1])
+
+
+class RecurrenceTests(TestCase):
+    def setUp(self):
+        self.upload = VideoUpload.objects.create(video_file='v.mp4', metadata_file='m.json')
+
+    def _detect(self, day, cell_x=0, status='pending'):
+        GarbageDetection.objects.create(
+            video_upload=self.upload, detected_at=datetime(2024, 1, day, tzinfo=timezone.utc), timestamp_ms=0,
+            frame_number=0, garbage_type='plastic', confidence=0.9, latitude=37.7705,
+            longitude=-122.4105 + cell_x * 0.001, location_accuracy=3, status=status,
+        )
+
+    def test_rate_is_recurrences_over_cleanings(self):
+        # Weeks of 2024-01-01, 08, 15, 22 and 29
+        # Cell 0: cleaned in weeks 1 and 3, dirty again in weeks 2 and 4
+        self._detect(1, status='cleaned')
+        self._detect(9)
+        self._detect(16, status='cleaned')
+        self._detect(23)
+        # Cell 1: cleaned in week 1, never seen again
+        self._detect(2, cell_x=1, status='cleaned')
+        # Cell 2: cleaned twice, dirty again only after the first cleaning
+        self._detect(3, cell_x=2, status='cleaned')
+        self._detect(17, cell_x=2, status='cleaned')
+        # Cell 3: dirty every week but never cleaned
+        for day in (1, 8, 15, 22):
+            self._detect(day, cell_x=3)
+
+        cells = cube.recurrence('week', date(2024, 1, 1), date(2024, 1, 31))
+        base_x = cube.cell_for(37.7705, -122.4105)[0]
+        stats = {
+            cell['cell_x'] - base_x: (cell['cleanings'], cell['recurrences'], cell['recurrence_rate'])
+            for cell in cells
+        }
+        self.assertEqual(stats, {0: (2, 2, 1.0), 1: (1, 0, 0.0), 2: (2, 1, 0.5)})
+        self.assertEqual([cell['recurrence_rate'] for cell in cells], [1.0, 0.5, 0.0])
+
+    def test_cleaning_in_last_bucket_is_not_counted(self):
+        self._detect(29, status='cleaned')
+        self.assertEqual(cube.recurrence('week', date(2024, 1, 1), date(2024, 1, 31)), [])
+
+
+class HeatmapApiTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('supervisor', password='pw'))
+        upload = VideoUpload.objects.create(video_file='v.mp4', metadata_file='m.json')
+        for i in range(3):
+            GarbageDetection.objects.create(
+                video_upload=upload, detected_at=datetime(2024, 1, 2 + i, tzinfo=timezone.utc), timestamp_ms=0,
+                frame_number=0, garbage_type='plastic', confidence=0.9, latitude=37.7705,
+                longitude=-122.4105 + (i > 0) * 0.001, location_accuracy=3,
+            )
+
+    def _get(self, endpoint, **params):
+        return self.client.get(f'/heatmap/api/{endpoint}/', {'start': '2024-01-01', 'end': '2024-01-31', **params})
+
+    def test_hotspots(self):
+        response = self._get('hotspots', limit=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([cell['count'] for cell in response.json()['hotspots']], [2])
+
+    def test_trend(self):
+        series = self._get('trend', granularity='month').json()['series']
+        self.assertEqual(series, [{'bucket': '2024-01-01', 'garbage_type': 'plastic', 'count': 3}])
+
+    def test_rejects_bad_params(self):
+        self.assertEqual(self._get('hotspots', limit=-1).status_code, 400)
+        self.assertEqual(self._get('hotspots', limit=0).status_code, 400)
+        self.assertEqual(self._get('recurrence', limit='x').status_code, 400)
+        self.assertEqual(self._get('cells', bbox='nan,37,-122,38').status_code, 400)
+        self.assertEqual(self._get('cells', bbox='-123,37,inf,38').status_code, 400)
+        self.assertEqual(self._get('cells', bbox='-1e308,37,1e308,38').status_code, 400)
+        self.assertEqual(self._get('cells', bbox='-123,37,-122,90.5').status_code, 400)
+        self.assertEqual(self._get('hotspots', limit=10 ** 30).status_code, 400)
+        self.assertEqual(self._get('hotspots', limit=1001).status_code, 400)
+        self.assertEqual(self._get('cells', granularity='year').status_code, 400)
+        self.assertEqual(self.client.get('/heatmap/api/cells/').status_code, 400)
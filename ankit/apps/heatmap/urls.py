@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'heatmap'
+
+urlpatterns = [
+    path('api/cells/', views.heatmap_api, name='heatmap_api'),
+    path('api/hotspots/', views.hotspots_api, name='hotspots_api'),
+    path('api/trend/', views.trend_api, name='trend_api'),
+    path('api/recurrence/', views.recurrence_api, name='recurrence_api'),
+]
@@ -0,0 +1,88 @@
+from django.utils.dateparse import parse_date
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from apps.maps.tracks import parse_bbox
+from . import cube
+
+MAX_LIMIT = 1000
+
+def _parse_query(request):
+    """
+    Common query params: start, end (YYYY-MM-DD, inclusive), granularity
+    (day/week/month, default week), optional bbox (min_lng,min_lat,max_lng,max_lat),
+    garbage_type and limit (1 to MAX_LIMIT)
+    """
+    start = parse_date(request.GET.get('start', ''))
+    end = parse_date(request.GET.get('end', ''))
+    if not start or not end:
+        raise ValueError('start and end dates (YYYY-MM-DD) are required')
+
+    granularity = request.GET.get('granularity', 'week')
+    if granularity not in cube.GRANULARITIES:
+        raise ValueError('granularity must be one of: ' + ', '.join(cube.GRANULARITIES))
+
+    bbox = parse_bbox(request.GET['bbox']) if request.GET.get('bbox') else None
+
+    limit = None
+    if request.GET.get('limit'):
+        try:
+            limit = int(request.GET['limit'])
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f'limit must be an integer from 1 to {MAX_LIMIT}')
+
+    return {
+        'granularity': granularity,
+        'start': start,
+        'end': end,
+        'bbox': bbox,
+        'garbage_type': request.GET.get('garbage_type') or None,
+    }, limit
+
+def _error(message):
+    return Response({
+        'error': message,
+        'status': 'error'
+    }, status=400)
+
+@api_view(['GET'])
+def heatmap_api(request):
+    """Detection count per grid cell"""
+    try:
+        query, limit = _parse_query(request)
+    except ValueError as e:
+        return _error(str(e))
+
+    return Response({'cells': cube.heatmap(limit=limit, **query)})
+
+@api_view(['GET'])
+def hotspots_api(request):
+    """Busiest grid cells, 10 by default"""
+    try:
+        query, limit = _parse_query(request)
+    except ValueError as e:
+        return _error(str(e))
+
+    return Response({'hotspots': cube.heatmap(limit=limit or 10, **query)})
+
+@api_view(['GET'])
+def trend_api(request):
+    """Detection count per time bucket and garbage type"""
+    try:
+        query, _ = _parse_query(request)
+    except ValueError as e:
+        return _error(str(e))
+
+    return Response({'series': cube.trend(**query)})
+
+@api_view(['GET'])
+def recurrence_api(request):
+    """Cells that get dirty again after cleaning, highest recurrence rate first"""
+    try:
+        query, limit = _parse_query(request)
+    except ValueError as e:
+        return _error(str(e))
+
+    return Response({'cells': cube.recurrence(limit=limit, **query)})
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import models
+
+from apps.detection.models import VideoUpload
+from .tracks import build_track
+
+class GpsTrack(models.Model):
+    """Compact, pre-simplified GPS track of a single video upload"""
+
+    video_upload = models.OneToOneField(VideoUpload, on_delete=models.CASCADE, related_name='gps_track')
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    point_count = models.IntegerField(default=0)
+
+    # Bounding box, used to filter tracks by map viewport
+    min_latitude = models.FloatField()
+    max_latitude = models.FloatField()
+    min_longitude = models.FloatField()
+    max_longitude = models.FloatField()
+
+    # Encoded polylines: full resolution plus Douglas-Peucker variants keyed by tolerance (m)
+    polyline = models.TextField()
+    simplified = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['started_at', 'ended_at']),
+            models.Index(fields=['min_latitude', 'max_latitude']),
+            models.Index(fields=['min_longitude', 'max_longitude']),
+        ]
+
+    def __str__(self):
+        return f"Track for upload {self.video_upload_id} ({self.point_count} points)"
+
+    @classmethod
+    def from_location_data(cls, video_upload, location_data):
+        """Create or replace the track of an upload, returns None if there are no points"""
+        track = build_track(location_data)
+        if track is None:
+            return None
+
+        start_ms = track.pop('start_timestamp')
+        end_ms = track.pop('end_timestamp')
+        start_relative_ms = track.pop('start_relative_ms')
+        end_relative_ms = track.pop('end_relative_ms')
+
+        track['started_at'] = cls._frame_time(video_upload, start_ms, start_relative_ms or 0)
+        track['ended_at'] = max(track['started_at'], cls._frame_time(
+            video_upload, end_ms,
+            end_relative_ms if end_relative_ms is not None else video_upload.recording_duration_ms,
+        ))
+
+        gps_track, _ = cls.objects.update_or_create(video_upload=video_upload, defaults=track)
+        return gps_track
+
+    @staticmethod
+    def _frame_time(video_upload, timestamp_ms, relative_ms):
+        """Frame epoch timestamp, else recording start + offset, else upload time"""
+        if timestamp_ms:
+            return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+        if video_upload.recording_start_time:
+            return video_upload.recording_start_time + timedelta(milliseconds=relative_ms or 0)
+        return video_upload.upload_timestamp
+
+    def polyline_for_tolerance(self, tolerance_m):
+        if tolerance_m is None:
+            return self.polyline
+        return self.simplified.get(str(tolerance_m), self.polyline)
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.accounts.models import User
+from apps.detection.models import VideoUpload
+from .models import GpsTrack
+from .tracks import decode_polyline, encode_polyline, simplify, tolerance_for_viewport
+
+
+class PolylineTests(SimpleTestCase):
+    def test_round_trip_with_negative_coordinates(self):
+        points = [(37.774929, -122.419415), (-33.868820, 151.209296), (-0.000001, -179.999999), (0.0, 0.0)]
+        decoded = decode_polyline(encode_polyline(points))
+        self.assertEqual(len(decoded), len(points))
+        for (lat, lng), (dec_lat, dec_lng) in zip(points, decoded):
+            self.assertAlmostEqual(lat, dec_lat, places=6)
+            self.assertAlmostEqual(lng, dec_lng, places=6)
+
+    def test_known_encoding_at_precision_5(self):
+        # Example from the Google polyline algorithm documentation
+        points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        self.assertEqual(encode_polyline(points, precision=5), '_p~iF~ps|U_ulLnnqC_mqNvxq`@')
+
+    def test_empty(self):
+        self.assertEqual(encode_polyline([]), '')
+        self.assertEqual(decode_polyline(''), [])
+
+
+class SimplifyTests(SimpleTestCase):
+    def test_removes_collinear_points_and_keeps_endpoints(self):
+        points = [(37.77, -122.41 + i * 0.0001) for i in range(50)]
+        self.assertEqual(simplify(points, 5), [points[0], points[-1]])
+
+    def test_keeps_corner(self):
+        # L-shaped track, the corner is ~110 m off the endpoints' chord
+        points = [(37.77 + i * 0.0001, -122.41) for i in range(10)]
+        points += [(37.7709, -122.41 + i * 0.0001) for i in range(1, 10)]
+        self.assertEqual(simplify(points, 5), [points[0], points[9], points[-1]])
+
+    def test_short_tracks_unchanged(self):
+        points = [(37.77, -122.41), (37.78, -122.42)]
+        self.assertEqual(simplify(points, 50), points)
+
+
+class ToleranceTests(SimpleTestCase):
+    def test_small_viewport_uses_full_track(self):
+        self.assertIsNone(tolerance_for_viewport(37.77, -122.42, 37.775, -122.415))
+
+    def test_city_viewport_uses_coarsest_fitting_tolerance(self):
+        # ~0.3 deg is ~33 km, i.e. ~33 m per pixel
+        self.assertEqual(tolerance_for_viewport(37.6, -122.6, 37.9, -122.3), 20)
+
+    def test_region_viewport_uses_coarsest_tolerance(self):
+        self.assertEqual(tolerance_for_viewport(36.0, -124.0, 39.0, -121.0), 50)
+
+
+def _frames(start_ms, points):
+    return [
+        {'timestamp': start_ms + i * 1000, 'relative_time_ms': i * 1000, 'latitude': lat, 'longitude': lng}
+        for i, (lat, lng) in enumerate(points)
+    ]
+
+
+class CoverageApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('surveyor', password='pw')
+        self.client.force_login(self.user)
+
+        jan = int(datetime(2024, 1, 15, tzinfo=timezone.utc).timestamp() * 1000)
+        feb = int(datetime(2024, 2, 15, tzinfo=timezone.utc).timestamp() * 1000)
+        self.sf = self._track(_frames(jan, [(37.77, -122.42), (37.78, -122.41)]))
+        self.la = self._track(_frames(jan, [(34.05, -118.25), (34.06, -118.24)]))
+        self.sf_feb = self._track(_frames(feb, [(37.77, -122.42), (37.78, -122.41)]))
+
+    def _track(self, location_data, **upload_fields):
+        upload = VideoUpload.objects.create(video_file='v.mp4', metadata_file='m.json', **upload_fields)
+        return GpsTrack.from_location_data(upload, location_data)
+
+    def _coverage(self, start, end, bbox):
+        response = self.client.get('/maps/api/coverage/', {'start': start, 'end': end, 'bbox': bbox})
+        self.assertEqual(response.status_code, 200)
+        return sorted(track['upload_id'] for track in response.json()['tracks'])
+
+    def test_filters_by_viewport_and_date_range(self):
+        sf_bbox = '-122.5,37.7,-122.3,37.8'
+        self.assertEqual(self._coverage('2024-01-01', '2024-01-31', sf_bbox), [self.sf.video_upload_id])
+        self.assertEqual(
+            self._coverage('2024-01-01', '2024-02-29', sf_bbox),
+            [self.sf.video_upload_id, self.sf_feb.video_upload_id],
+        )
+        self.assertEqual(self._coverage('2024-01-01', '2024-01-31', '-118.3,34.0,-118.2,34.1'), [self.la.video_upload_id])
+        self.assertEqual(self._coverage('2024-03-01', '2024-03-31', sf_bbox), [])
+
+    def test_returned_polyline_decodes_to_track(self):
+        response = self.client.get(
+            '/maps/api/coverage/', {'start': '2024-01-15', 'end': '2024-01-15', 'bbox': '-122.43,37.76,-122.40,37.79'}
+        )
+        track = next(t for t in response.json()['tracks'] if t['upload_id'] == self.sf.video_upload_id)
+        self.assertEqual(decode_polyline(track['polyline']), [(37.77, -122.42), (37.78, -122.41)])
+
+    def test_rejects_bad_params(self):
+        self.assertEqual(self.client.get('/maps/api/coverage/', {'bbox': '0,0,1,1'}).status_code, 400)
+        for bbox in ('0,0', 'nan,37,-122,38', '-123,37,inf,38', '-1e308,37,1e308,38', '-123,-91,-122,38'):
+            response = self.client.get('/maps/api/coverage/', {'start': '2024-01-01', 'end': '2024-01-31', 'bbox': bbox})
+            self.assertEqual(response.status_code, 400, bbox)
+
+    def test_falls_back_to_recording_start_time(self):
+        start = datetime(2024, 1, 20, 9, 0, tzinfo=timezone.utc)
+        frames = [
+            {'timestamp': None, 'relative_time_ms': 0, 'latitude': 37.77, 'longitude': -122.42},
+            {'relative_time_ms': 5000, 'latitude': 37.78, 'longitude': -122.41},
+        ]
+        track = self._track(frames, recording_start_time=start, recording_duration_ms=6000)
+        self.assertEqual(track.started_at, start)
+        self.assertEqual((track.ended_at - start).total_seconds(), 5)
+
+    def test_falls_back_to_upload_time(self):
+        track = self._track([{'latitude': 37.77, 'longitude': -122.42}])
+        self.assertEqual(track.started_at, track.video_upload.upload_timestamp)
+        self.assertEqual(track.ended_at, track.video_upload.upload_timestamp)
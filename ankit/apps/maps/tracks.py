@@ -0,0 +1,253 @@
+"""GPS track compaction for coverage overlays.
+
+Tracks are stored as encoded polylines (delta + zigzag + base64-ish varints,
+the same scheme Google Maps uses) so a recording of thousands of points is
+a few kilobytes of text instead of megabytes of per-point JSON.
+"""
+import math
+
+# Coordinates are stored with 6 decimal places (~0.1 m), enough for street level
+POLYLINE_PRECISION = 6
+
+# Douglas-Peucker tolerances (meters) pre-computed for every track
+SIMPLIFY_TOLERANCES_M = (5, 20, 50)
+
+EARTH_RADIUS_M = 6371008.8
+
+# Epoch ms accepted as recording/frame timestamps (1970 up to 2100)
+MAX_EPOCH_MS = 4102444800000
+
+# Upper bound for relative times and durations, the IntegerField range (~24 days)
+MAX_DURATION_MS = 2 ** 31 - 1
+
+
+def as_number(value, minimum, maximum):
+    """
+    Return `value` if it is a real, finite number within [minimum, maximum]
+
+    Metadata comes straight from the client, so strings, booleans, NaN and
+    absurd magnitudes all map to None instead of reaching the math below.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if not minimum <= value <= maximum:
+        return None
+    return value
+
+
+def parse_bbox(value):
+    """
+    Parse a `min_lng,min_lat,max_lng,max_lat` viewport
+
+    Raises:
+        ValueError: If the value is malformed or outside valid coordinates
+    """
+    try:
+        bbox = [float(v) for v in value.split(',')]
+    except ValueError:
+        bbox = []
+    if len(bbox) != 4:
+        raise ValueError('bbox must be min_lng,min_lat,max_lng,max_lat')
+
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if any(as_number(lng, -180, 180) is None for lng in (min_lng, max_lng)) or \
+            any(as_number(lat, -90, 90) is None for lat in (min_lat, max_lat)):
+        raise ValueError('bbox longitudes must be within ±180 and latitudes within ±90')
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def encode_polyline(points, precision=POLYLINE_PRECISION):
+    """
+    Encode a list of (latitude, longitude) pairs as a polyline string
+
+    Args:
+        points: Iterable of (latitude, longitude) tuples
+        precision: Number of decimal places to keep
+
+    Returns:
+        Encoded polyline string
+    """
+    factor = 10 ** precision
+    output = []
+    prev_lat = prev_lng = 0
+
+    for lat, lng in points:
+        lat_i = int(round(lat * factor))
+        lng_i = int(round(lng * factor))
+        _encode_value(lat_i - prev_lat, output)
+        _encode_value(lng_i - prev_lng, output)
+        prev_lat, prev_lng = lat_i, lng_i
+
+    return ''.join(output)
+
+
+def decode_polyline(encoded, precision=POLYLINE_PRECISION):
+    """
+    Decode a polyline string back into (latitude, longitude) pairs
+    """
+    factor = 10 ** precision
+    points = []
+    index = lat = lng = 0
+    length = len(encoded)
+
+    while index < length:
+        delta, index = _decode_value(encoded, index)
+        lat += delta
+        delta, index = _decode_value(encoded, index)
+        lng += delta
+        points.append((lat / factor, lng / factor))
+
+    return points
+
+
+def _encode_value(value, output):
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        output.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    output.append(chr(value + 63))
+
+
+def _decode_value(encoded, index):
+    result = shift = 0
+    while True:
+        byte = ord(encoded[index]) - 63
+        index += 1
+        result |= (byte & 0x1f) << shift
+        shift += 5
+        if byte < 0x20:
+            break
+    value = ~(result >> 1) if result & 1 else result >> 1
+    return value, index
+
+
+def simplify(points, tolerance_m):
+    """
+    Simplify a track with the Douglas-Peucker algorithm
+
+    Distances are measured on a local equirectangular projection, which is
+    accurate to well under a meter at the scale of a single recording.
+
+    Args:
+        points: List of (latitude, longitude) tuples
+        tolerance_m: Maximum allowed deviation in meters
+
+    Returns:
+        List of (latitude, longitude) tuples, always keeping both endpoints
+    """
+    if len(points) < 3:
+        return list(points)
+
+    ref_lat = math.radians(points[0][0])
+    x_scale = math.cos(ref_lat) * math.radians(1) * EARTH_RADIUS_M
+    y_scale = math.radians(1) * EARTH_RADIUS_M
+    xy = [(lng * x_scale, lat * y_scale) for lat, lng in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    # Iterative rather than recursive so long recordings can't hit the recursion limit
+    while stack:
+        start, end = stack.pop()
+        max_dist = 0.0
+        max_index = start
+        for i in range(start + 1, end):
+            dist = _segment_distance(xy[i], xy[start], xy[end])
+            if dist > max_dist:
+                max_dist = dist
+                max_index = i
+
+        if max_dist > tolerance_m:
+            keep[max_index] = True
+            stack.append((start, max_index))
+            stack.append((max_index, end))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _segment_distance(point, start, end):
+    px, py = point
+    ax, ay = start
+    bx, by = end
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+
+    if length_sq == 0:
+        return math.hypot(px - ax, py - ay)
+
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def build_track(location_data):
+    """
+    Compact a `location_data` array from upload metadata
+
+    Args:
+        location_data: List of location frames as sent by the Android app.
+            Frames without valid coordinates are skipped, invalid times are
+            treated as missing
+
+    Returns:
+        Dictionary with the encoded full track, simplified variants keyed by
+        tolerance, bounding box and time range (epoch and relative ms, either
+        may be None), or None if there are no usable points
+    """
+    frames = []
+    for frame in location_data:
+        if not isinstance(frame, dict):
+            continue
+        latitude = as_number(frame.get('latitude'), -90, 90)
+        longitude = as_number(frame.get('longitude'), -180, 180)
+        if latitude is None or longitude is None:
+            continue
+        frames.append((
+            as_number(frame.get('timestamp'), 0, MAX_EPOCH_MS),
+            as_number(frame.get('relative_time_ms'), 0, MAX_DURATION_MS),
+            latitude,
+            longitude,
+        ))
+    if not frames:
+        return None
+
+    # Missing times sort first rather than breaking the comparison
+    frames.sort(key=lambda frame: (frame[0] or 0, frame[1] or 0))
+    points = [(latitude, longitude) for _, _, latitude, longitude in frames]
+    latitudes = [lat for lat, _ in points]
+    longitudes = [lng for _, lng in points]
+
+    return {
+        'polyline': encode_polyline(points),
+        'simplified': {
+            str(tolerance): encode_polyline(simplify(points, tolerance))
+            for tolerance in SIMPLIFY_TOLERANCES_M
+        },
+        'point_count': len(points),
+        'min_latitude': min(latitudes),
+        'max_latitude': max(latitudes),
+        'min_longitude': min(longitudes),
+        'max_longitude': max(longitudes),
+        'start_timestamp': frames[0][0],
+        'end_timestamp': frames[-1][0],
+        'start_relative_ms': frames[0][1],
+        'end_relative_ms': frames[-1][1],
+    }
+
+
+def tolerance_for_viewport(min_lat, min_lng, max_lat, max_lng, pixels=1000):
+    """
+    Pick the coarsest stored tolerance that stays below one screen pixel
+
+    Returns:
+        Tolerance in meters, or None if the full-resolution track is needed
+    """
+    mid_lat = math.radians((min_lat + max_lat) / 2)
+    width_m = math.radians(max_lng - min_lng) * math.cos(mid_lat) * EARTH_RADIUS_M
+    height_m = math.radians(max_lat - min_lat) * EARTH_RADIUS_M
+    meters_per_pixel = max(width_m, height_m) / pixels
+
+    candidates = [t for t in SIMPLIFY_TOLERANCES_M if t <= meters_per_pixel]
+    return max(candidates) if candidates else None
@@ -5,4 +5,5 @@ app_name = 'maps'
 
 urlpatterns = [
     path('', views.map_view, name='map_view'),
-]
\ No newline at end of file
+    path('api/coverage/', views.coverage_api, name='coverage_api'),
+]
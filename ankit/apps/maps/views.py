@@ -1,6 +1,67 @@
+from datetime import datetime, time, timezone
+
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.utils.dateparse import parse_date
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .models import GpsTrack
+from .tracks import parse_bbox, tolerance_for_viewport
 
 @login_required
 def map_view(request):
-    return render(request, 'maps/map_view.html')
\ No newline at end of file
+    return render(request, 'maps/map_view.html')
+
+@api_view(['GET'])
+def coverage_api(request):
+    """
+    Streets covered by recordings in a date range and viewport
+
+    Query params:
+        start, end: Dates (YYYY-MM-DD), inclusive
+        bbox: min_lng,min_lat,max_lng,max_lat
+    """
+    start = parse_date(request.GET.get('start', ''))
+    end = parse_date(request.GET.get('end', ''))
+    if not start or not end:
+        return Response({
+            'error': 'start and end dates (YYYY-MM-DD) are required',
+            'status': 'error'
+        }, status=400)
+
+    try:
+        min_lng, min_lat, max_lng, max_lat = parse_bbox(request.GET.get('bbox', ''))
+    except ValueError as e:
+        return Response({
+            'error': str(e),
+            'status': 'error'
+        }, status=400)
+
+    tolerance = tolerance_for_viewport(min_lat, min_lng, max_lat, max_lng)
+
+    # Overlap tests on time range and bounding box
+    tracks = GpsTrack.objects.filter(
+        started_at__lte=datetime.combine(end, time.max, tzinfo=timezone.utc),
+        ended_at__gte=datetime.combine(start, time.min, tzinfo=timezone.utc),
+        min_latitude__lte=max_lat,
+        max_latitude__gte=min_lat,
+        min_longitude__lte=max_lng,
+        max_longitude__gte=min_lng,
+    ).order_by('started_at')
+
+    # Avoid loading the full-resolution polyline when a simplified one will do
+    tracks = tracks.only('video_upload_id', 'started_at', 'simplified') if tolerance else tracks.defer('simplified')
+
+    return Response({
+        'tolerance_m': tolerance,
+        'count': len(tracks),
+        'tracks': [
+            {
+                'upload_id': track.video_upload_id,
+                'started_at': track.started_at,
+                'polyline': track.polyline_for_tolerance(tolerance),
+            }
+            for track in tracks
+        ]
+    })
@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     'apps.dashboard', 
     'apps.detection',
     'apps.maps',
+    'apps.heatmap',
 ]
 
 MIDDLEWARE = [
@@ -141,4 +142,7 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024   # 100MB
 
 # YOLO Model settings
 YOLO_MODEL_PATH = BASE_DIR / 'models' / 'yolo_garbage_detection.pt'
-CONFIDENCE_THRESHOLD = 0.5
\ No newline at end of file
+CONFIDENCE_THRESHOLD = 0.5
+
+# Heatmap settings (changing the cell size requires `manage.py rebuild_heatmap`)
+HEATMAP_CELL_SIZE_DEG = 0.001  # ~110m, roughly one city block
@@ -11,6 +11,7 @@ urlpatterns = [
     path('dashboard/', include('apps.dashboard.urls')),
     path('detection/', include('apps.detection.urls')),
     path('maps/', include('apps.maps.urls')),
+    path('heatmap/', include('apps.heatmap.urls')),
     path('api/', include('apps.detection.urls')),  # API endpoints
 ]
 
@@ -21,6 +21,7 @@ python manage.py makemigrations accounts
 python manage.py makemigrations dashboard
 python manage.py makemigrations detection
 python manage.py makemigrations maps
+python manage.py makemigrations heatmap
 python manage.py makemigrations
 
 echo.